@@ -133,6 +133,9 @@ def distribution(x, x_true=None, x_err=None, sigma=2, plottype='step',
      A `step_legacy` method is available: it plots the histogram using the
      `plt.hist` method (and thus cannot handle errors). It can be used to
      check that the `step` method gives the correct result.
+
+     `bins` can be a number of bins or, for the `step` and `line` modes, the
+     bin edges (in which case `range` is not used).
     """
 
     # TODO: PDF has a problem sometimes (see CICY)
@@ -151,8 +154,8 @@ def distribution(x, x_true=None, x_err=None, sigma=2, plottype='step',
 
     sigma = int(sigma)
 
-    # compute range
-    if range is None and x_true is not None:
+    # compute range (not needed if the bin edges are given)
+    if range is None and x_true is not None and np.ndim(bins) == 0:
         range = [np.min([x, x_true]), np.max([x, x_true])]
 
     if isinstance(label, list):
@@ -167,7 +170,8 @@ def distribution(x, x_true=None, x_err=None, sigma=2, plottype='step',
         # label_true = self.styles["label:true"]
 
     # TODO: add option for this behaviour?
-    bins = bins or logger.find_bins(x)
+    if bins is None:
+        bins = logger.find_bins(x)
 
     # build histogram by hand
     x_hist, edges = np.histogram(x, bins=bins, range=range,
@@ -341,9 +345,100 @@ def distribution(x, x_true=None, x_err=None, sigma=2, plottype='step',
     return fig
 
 
+def _pearson(values):
+    """
+    Compute the Pearson correlation matrix between the columns of an array.
+
+    The product of the normalized matrix with its own transpose is
+    symmetric: numpy computes it with a single BLAS `syrk` call, which fills
+    only one triangle before mirroring it.
+    """
+
+    x = values - values.mean(axis=0)
+
+    # constant columns have no correlation (NaN), as with pandas
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x /= np.linalg.norm(x, axis=0)
+
+    corr = x.T @ x
+
+    return np.clip(corr, -1, 1, out=corr)
+
+
+def _nan_pearson(values):
+    """
+    Compute the Pearson correlation matrix, deleting missing values pairwise.
+
+    Non-finite values are masked as in pandas. The sums over the rows valid
+    for each pair of columns are obtained for all pairs at once from
+    products of the masked matrices, instead of looping over the pairs.
+    """
+
+    mask = np.isfinite(values)
+    valid = mask.astype(values.dtype)
+    n = valid.T @ valid
+
+    # centre the columns to limit cancellations in the sums below
+    x = np.where(mask, values, 0)
+    x = np.where(mask, x - x.sum(axis=0) / np.maximum(valid.sum(axis=0), 1),
+                 0)
+
+    # sums of x_i and x_i^2 over the rows where both x_i and x_j are valid
+    sx = x.T @ valid
+    sxx = (x * x).T @ valid
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = x.T @ x - sx * sx.T / n
+        var = sxx - sx**2 / n
+        corr = cov / np.sqrt(var * var.T)
+
+    corr[n < 2] = np.nan
+
+    return np.clip(corr, -1, 1, out=corr)
+
+
+def correlation_matrix(data, method="pearson", dtype=np.float64):
+    """
+    Compute the correlation matrix between the columns of a dataframe.
+
+    Pearson and Spearman correlations are computed with numpy from the
+    column values (ranked first for Spearman), deleting missing values
+    pairwise for Pearson. Pandas `.corr()` is used for callable methods, for
+    non-numerical columns, for other methods (such as Kendall) and for
+    Spearman with missing values (ranks then depend on each pair).
+
+    The numpy computations are done with `dtype`: `np.float32` halves the
+    memory traffic and is usually precise enough for exploration. The matrix
+    is always returned in double precision.
+    """
+
+    numerical = all(pd.api.types.is_numeric_dtype(t) for t in data.dtypes)
+
+    if (method not in ("pearson", "spearman") or not numerical
+            or data.shape[1] == 0):
+        return data.corr(method=method)
+
+    values = data.to_numpy(dtype=dtype, na_value=np.nan)
+    finite = np.isfinite(values).all()
+
+    if method == "spearman":
+        if not finite:
+            return data.corr(method=method)
+
+        values = data.rank().to_numpy(dtype=dtype)
+
+    if finite:
+        corr = _pearson(values)
+    else:
+        corr = _nan_pearson(values)
+
+    return pd.DataFrame(corr.astype(np.float64, copy=False),
+                        index=data.columns, columns=data.columns)
+
+
 def correlations(data, features=None, targets=None, method="pearson",
-                 cmap=None, y_rot=45, filename="", logtime=False,
-                 logger=None):
+                 cmap=None, y_rot=45, ax=None, corr=None, dtype=np.float64,
+                 filename="", logtime=False, logger=None):
     """
     Compute and plot correlations between variables.
 
@@ -354,13 +449,21 @@ def correlations(data, features=None, targets=None, method="pearson",
 
     The method can be `pearson`, `spearman`, `kendall` or a callable.
 
-    The function is using pandas `.corr()` method. If `data` is a dict, it is
-    first converted to a dataframe. To prevent errors, only numerical types
-    are conserved before conversion.
+    The matrix is computed with `correlation_matrix` (in precision `dtype`).
+    If `data` is a dict, it is first converted to a dataframe. To prevent
+    errors, only numerical types are conserved before conversion.
 
     Correlation are valid only for numerical features, thus, the results may
     miss some of the features and targets given as inputs if they are not
     numerical.
+
+    If `ax` is given, the matrix is drawn in it (for example to group several
+    matrices in one figure) and its figure is returned: the layout and
+    closing of the figure are then left to the caller.
+
+    A correlation matrix `corr` already computed with the same method for
+    (at least) all the features and targets can be given: the matrix is then
+    sliced instead of being computed again.
     """
 
     # TODO: check if pandas compute correlation for more general types like
@@ -392,11 +495,15 @@ def correlations(data, features=None, targets=None, method="pearson",
     else:
         targets = features
 
+    # the dataframe shares the memory of the arrays: it is only read
     if isinstance(data, dict):
-        data = pd.DataFrame({k: v for k, v in data.items()
-                             if k in all_features})
+        data = pd.DataFrame({k: data[k] for k in dict.fromkeys(all_features)},
+                            copy=False)
 
-    corr = data[all_features].corr(method=method)
+    if corr is None:
+        corr = correlation_matrix(data[all_features], method, dtype)
+    else:
+        corr = corr.loc[all_features, all_features]
 
     # adapt features and targets if they contain columns for which
     # correlations could not be computed
@@ -406,7 +513,12 @@ def correlations(data, features=None, targets=None, method="pearson",
     if features != targets:
         corr = corr.loc[features, targets]
 
-    fig, ax = plt.subplots()
+    if ax is None:
+        fig, ax = plt.subplots()
+        own_fig = True
+    else:
+        fig = ax.figure
+        own_fig = False
 
     if cmap is None:
         cmap = "RdBu_r"
@@ -428,13 +540,15 @@ def correlations(data, features=None, targets=None, method="pearson",
 
     # from mpl_toolkits.axes_grid1 import make_axes_locatable
 
-    fig.colorbar(pcm, ax=ax)
+    cbar = fig.colorbar(pcm, ax=ax)
 
-    sns.despine(fig=fig, top=True, bottom=True, left=True, right=True)
+    for a in (ax, cbar.ax):
+        sns.despine(ax=a, top=True, bottom=True, left=True, right=True)
 
-    fig.tight_layout()
+    if own_fig is True:
+        fig.tight_layout()
 
-    plt.close(fig)
+        plt.close(fig)
 
     if logger is not None:
         logger.save_fig(fig, filename, logtime)
@@ -452,42 +566,44 @@ def correlation_text(corr):
     features = corr.index.tolist()
     targets = corr.columns.tolist()
 
-    text = ""
+    # read all coefficients at once instead of indexing the dataframe
+    values = corr.to_numpy()
+
+    lines = []
 
     if features == targets:
         # write coefficients as table
 
         names = dt.equal_length_names(features, align="right")
 
-        for i, (name, col) in enumerate(zip(names, features)):
-            text += name
-            text += "".join(corr_fmt.format(v) for j, v
-                            in enumerate(corr.loc[col].values) if j <= i)
-            text += "\n"
+        for i, name in enumerate(names):
+            lines.append(name + "".join(corr_fmt.format(v)
+                                        for v in values[i, :i + 1]))
     else:
         # write coefficients as list
 
-        names = dt.equal_length_names(dict(zip(features, features)),
-                                             align="left")
+        names = dt.equal_length_names(features, align="left")
         item_fmt = "  ∝ {}  " + corr_fmt
 
-        for target in targets:
-            text += "- {}\n".format(target)
-            text += "\n".join(item_fmt.format(name, corr[target][col])
-                              for name, col in names.items())
-
-            text += "\n\n"
+        for j, target in enumerate(targets):
+            lines.append("- {}".format(target))
+            lines.extend(item_fmt.format(name, v)
+                         for name, v in zip(names, values[:, j]))
+            lines.append("")
 
+    text = "\n".join(lines)
     text = text.strip("\n")
 
     return text
 
 
 def importances(data, outputs, inputs=None, n_estimators=20, sum_tensor=False,
-                label_rot=45, ymax=1, mode="dataframe", filename="",
+                label_rot=45, ymax=1, mode="dataframe", n_jobs=-1, filename="",
                 logtime=False, logger=None):
     """
     Compute input importances for outputs from random forest.
+
+    The trees are fitted in parallel on `n_jobs` cores (all by default).
     """
 
     # TODO: adapt figure when there are a lot of features
@@ -519,7 +635,7 @@ def importances(data, outputs, inputs=None, n_estimators=20, sum_tensor=False,
 
     # TODO: add random forest for classification
 
-    model_params = {"n_estimators": n_estimators}
+    model_params = {"n_estimators": n_estimators, "n_jobs": n_jobs}
 
     struct = DataStructure(inputs, infer=data)
     importances = {}
@@ -74,7 +74,12 @@ class TensorEval:
         absolute value.
         """
 
-        if isinstance(norm, (int, str)):
+        if norm == 2 and np.issubdtype(tensor.dtype, np.floating):
+            # sum of squares computed without the temporary array of squares
+            # created by `np.linalg.norm`
+            tensor = tensor.reshape(len(tensor), -1)
+            return np.sqrt(np.einsum('ij,ij->i', tensor, tensor))
+        elif isinstance(norm, (int, str)):
             return np.linalg.norm(tensor.reshape(len(tensor), -1),
                                   ord=norm, axis=1)
         elif callable(norm) is True:
@@ -142,13 +147,24 @@ class TensorEval:
         errors = np.subtract(y_pred, y_true)
 
         if relative is True:
-            errors = np.divide(errors, np.abs(y_true))
+            errors = TensorEval.relative_errors(errors, y_true)
 
         if signed is False:
             errors = np.abs(errors)
 
         return errors
 
+    @staticmethod
+    def relative_errors(errors, y_true):
+        """
+        Compute the relative errors from precomputed errors.
+
+        This avoids recomputing the difference between the tensors when both
+        the absolute and relative errors are needed.
+        """
+
+        return np.divide(errors, np.abs(y_true))
+
     @staticmethod
     def rmse(y_pred, y_true):
         n = np.sqrt(np.size(y_pred))
@@ -285,13 +285,26 @@ class Logger:
 
     def save_text(self, text, filename="", logtime=True):
 
+        # encode the full text once and write it as a single buffer
+        self.save_bytes(text.encode("utf-8"), filename, logtime)
+
+    def save_bytes(self, data, filename="", logtime=True):
+
         if filename == "":
             return
 
         filename = self.expandpath(filename, logtime)
 
-        with open(filename, 'w') as f:
-            f.write(text)
+        # write directly to the file descriptor, without Python's buffered
+        # layer (os.write can write only part of the buffer)
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+
+        try:
+            view = memoryview(data)
+            while len(view) > 0:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
 
     def save_csv(self, data, sep='\t', float_fmt=None, filename="",
                  logtime=True):
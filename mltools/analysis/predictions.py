@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from functools import cached_property
+
 import pandas as pd
 import numpy as np
 
@@ -22,6 +24,20 @@ from mltools.data.structure import DataStructure
 #   tensors, etc.)
 
 
+def _sorted_dataframe(dic, idx, order):
+    """
+    Build a dataframe indexed by id and sorted according to it.
+
+    The arrays are sorted with the permutation `order` (computed once by the
+    caller) before creating the dataframe, which avoids sorting the latter.
+    Since the sorted arrays are new, they don't need to be copied again.
+    """
+
+    return pd.DataFrame({k: v[order] for k, v in dic.items()},
+                        index=pd.Index(np.asarray(idx)[order], name="id"),
+                        copy=False)
+
+
 class Predictions:
 
     def __init__(self, X, y_pred=None, y_true=None, y_std=None,
@@ -228,6 +244,15 @@ class Predictions:
 
         self.postprocessing_fn = postprocessing_fn
 
+        def to_integers(fn, y):
+            if fn is np.round:
+                # round directly into an integer array for the default
+                # decision, instead of creating an intermediate float array
+                return np.rint(y, out=np.empty(np.shape(y), dtype=int),
+                               casting="unsafe")
+            else:
+                return fn(y).astype(int)
+
         # process data
         for col, fn in self.categories_fn.items():
             if col not in self.y_pred:
@@ -243,11 +268,11 @@ class Predictions:
             if col not in self.y_pred:
                 continue
 
-            self.y_pred[col] = fn(self.y_pred[col]).astype(int)
+            self.y_pred[col] = to_integers(fn, self.y_pred[col])
 
             if self.all_y_pred is not None:
                 for i, y in enumerate(self.all_y_pred):
-                    self.all_y_pred[i][col] = fn(y[col]).astype(int)
+                    self.all_y_pred[i][col] = to_integers(fn, y[col])
 
         if self.postprocessing_fn is not None:
             self.y_pred = self.postprocessing_fn(self.y_pred)
@@ -259,6 +284,10 @@ class Predictions:
 
         dic = {}
 
+        # split the ensemble predictions by feature in a single pass
+        if self.all_y_pred is not None:
+            all_y_pred = datatools.exchange_list_dict(self.all_y_pred)
+
         for k in self.features:
             metric = self.metrics.get(k, None)
             eval_method = self._prediction_type(k)
@@ -267,7 +296,7 @@ class Predictions:
             if self.all_y_pred is None:
                 all_pred = None
             else:
-                all_pred = [p[k] for p in self.all_y_pred]
+                all_pred = all_y_pred[k]
 
             dic[k] = eval_method(k, self.y_pred[k], self.y_true[k],
                                  all_pred, std, self.idx, metric, self.logger)
@@ -319,7 +348,16 @@ class Predictions:
                   for f, p in pred_items}
 
         if mode == 'dataframe':
-            return pd.DataFrame(errors)
+            values = list(errors.values())
+
+            # building from a single 2d array is faster than from a dict of
+            # columns, but it is possible only for vectors of the same type
+            if (all(np.ndim(v) == 1 for v in values)
+                    and len(set(v.dtype for v in values)) == 1):
+                return pd.DataFrame(np.column_stack(values),
+                                    columns=list(errors.keys()), copy=False)
+            else:
+                return pd.DataFrame(errors)
         else:
             return errors
 
@@ -328,8 +366,31 @@ class Predictions:
         if percentiles is None:
             percentiles = [0.25, 0.5, 0.75, 0.95]
 
-        return self.get_errors(mode="dataframe", relative=relative)\
-                   .abs().describe(percentiles=percentiles)
+        # compute the same statistics as `DataFrame.describe` for all
+        # features at once, reusing the cached absolute errors
+        # (as for pandas, NaN are ignored)
+        percentiles = np.unique(percentiles)
+
+        if relative is True:
+            errors = [p.abs_rel_errors for p in self.predictions.values()]
+        else:
+            errors = [p.abs_errors for p in self.predictions.values()]
+
+        errors = np.stack(errors, axis=1)
+
+        stats = np.vstack([np.sum(~np.isnan(errors), axis=0),
+                           np.nanmean(errors, axis=0),
+                           np.nanstd(errors, axis=0, ddof=1),
+                           np.nanmin(errors, axis=0),
+                           np.nanpercentile(errors, 100 * percentiles, axis=0),
+                           np.nanmax(errors, axis=0)])
+
+        index = (["count", "mean", "std", "min"]
+                 + ["{:g}%".format(100 * p) for p in percentiles]
+                 + ["max"])
+
+        return pd.DataFrame(stats, index=index,
+                            columns=list(self.predictions.keys()))
 
     def get_feature(self, feature, mode="", filename="", logtime=True):
 
@@ -337,24 +398,26 @@ class Predictions:
 
     def get_all_features(self, mode="", filename="", logtime=True):
 
-        if self.idx is not None:
-            dic = {"id": self.idx}
-        else:
-            dic = {}
+        # read the arrays directly from the predictions instead of going
+        # through `get_feature`, which builds an intermediate dataframe for
+        # each feature
+        columns = {}
 
         for feature in self.features:
-            dic.update(datatools.affix_keys(self.get_feature(feature),
-                                            prefix="%s_" % feature))
-
-        # remove duplicate id columns
-        dic = {k: v for k, v in dic.items() if not k.endswith("_id")}
+            dic = self.predictions[feature]._get_feature_raw(drop_id=True)
+            columns.update((f"{feature}_{k}", v) for k, v in dic.items())
 
         mode = mode or self.mode
 
-        df = pd.DataFrame(dic)
-
         if self.idx is not None:
-            df = df.set_index("id").sort_values(by=['id'])
+            df = _sorted_dataframe(columns, self.idx, self._idx_order)
+
+            dic = {"id": self.idx, **columns}
+        else:
+            df = pd.DataFrame(columns)
+
+            dic = columns
+
         if self.logger is not None:
             self.logger.save_csv(df, filename=filename, logtime=logtime)
 
@@ -364,6 +427,11 @@ class Predictions:
         else:
             return dic
 
+    @cached_property
+    def _idx_order(self):
+        # permutation sorting the samples by id
+        return np.argsort(np.asarray(self.idx), kind="stable")
+
     def feature_metric(self, feature, metric=None, mode=None):
 
         return self.predictions[feature].feature_metric(metric, mode)
@@ -403,9 +471,16 @@ class Predictions:
             self.logger.save_json(json, filename=filename, logtime=logtime)
 
         if mode == "text":
-            results = {f: self.feature_all_metrics(f, mode="dict_text")
-                       for f in self.features}
-            results = Logger.dict_to_text(results, sep="\n")
+            # format the results computed above instead of evaluating all
+            # metrics a second time
+            text = {}
+
+            for f, v in results.items():
+                values, std = v if self.all_y_pred is not None else (v, None)
+                text[f] = self.predictions[f]._pretty_metric_text(values, std,
+                                                                  self.logger)
+
+            results = Logger.dict_to_text(text, sep="\n")
 
         return results
 
@@ -644,35 +719,68 @@ class TensorPredictions:
         # adding the feature name is necessary for plot labels
         self.feature = feature
 
-        self.y_pred = y_pred
-        self.y_true = y_true
+        # contiguous arrays can be flattened without copy
+        self.y_pred = np.ascontiguousarray(y_pred)
+        self.y_true = np.ascontiguousarray(y_true)
 
         self.all_y_pred = all_y_pred
-        self.y_std = y_std
 
-        self.is_scalar = self.method.is_scalar(self.y_pred)
+        if y_std is not None:
+            self.y_std = np.ascontiguousarray(y_std)
+        else:
+            self.y_std = None
+
+        # same as `method.is_scalar`, but `y_pred` is known to be an array
+        self.is_scalar = self.y_pred.ndim <= 1
 
-        self.errors = self.method.errors(y_true, y_pred)
-        self.rel_errors = self.method.errors(y_true, y_pred, relative=True)
+        # cache of the evaluated metrics, such that metrics requested by
+        # several methods (e.g. the default metric) are computed only once
+        self._metric_cache = {}
 
-        if self.is_scalar is False:
-            # TODO: add norm arguments?
-            norm = 2
+    # errors are computed only when first accessed and then cached, such
+    # that variants which are never used (e.g. norm errors when only
+    # metrics are needed) are never computed
 
-            self.norm_errors = self.method.norm_errors(y_true, y_pred, norm)
-            self.rel_norm_errors = self.method.norm_errors(y_true, y_pred,
-                                                           relative=True,
-                                                           norm=norm)
-        else:
-            self.norm_errors = None
-            self.rel_norm_errors = None
+    @cached_property
+    def errors(self):
+        return self.method.errors(self.y_true, self.y_pred)
+
+    @cached_property
+    def rel_errors(self):
+        # reuse the absolute errors instead of computing the difference again
+        return self.method.relative_errors(self.errors, self.y_pred)
+
+    @cached_property
+    def abs_errors(self):
+        return np.abs(self.errors)
+
+    @cached_property
+    def abs_rel_errors(self):
+        return np.abs(self.rel_errors)
+
+    @cached_property
+    def norm_errors(self):
+        if self.is_scalar is True:
+            return None
+
+        # same as `method.norm_errors`, but reuse the cached errors instead
+        # of computing the difference again
+        # TODO: add norm arguments?
+        return self.method.norm(self.errors, norm=2)
+
+    @cached_property
+    def rel_norm_errors(self):
+        if self.is_scalar is True:
+            return None
+
+        return self.norm_errors / self.method.vector_norm(self.y_pred, norm=2)
 
     def get_errors(self, mode="", relative=False, norm=False, **kwgargs):
         """
         Return errors.
 
         This method is just another way to retrieve the errors which are
-        always save as attributes to avoid recomputing.
+        cached as attributes (on first access) to avoid recomputing.
 
         `**kwargs` is used to catch parameters transmitted for other feature
         types.
@@ -691,21 +799,25 @@ class TensorPredictions:
 
     def _pretty_metric_text(self, data, std=None, logger=None):
 
-        dic = {}
-
         logger = logger or Logger
         float_fmt = logger.styles["print:float"]
 
-        for k, v in data.items():
-            # improve names
-            new_k = self.method._metric_names.get(k, k)
+        # improve names and set them to the same length
+        names = [self.method._metric_names.get(k, k) for k in data]
+        length = max(map(len, names))
+
+        dic = {}
+
+        for name, (k, v) in zip(names, data.items()):
             # format number according to float format
-            dic[new_k] = float_fmt.format(v)
+            text = float_fmt.format(v)
 
             if std is not None:
-                dic[new_k] += " ± " + float_fmt.format(std[k])
+                text += " ± " + float_fmt.format(std[k])
+
+            dic[name.ljust(length)] = text
 
-        return datatools.equal_length_names(dic)
+        return dic
 
     def get_feature(self, mode="dict", filename="", logtime=True):
         """
@@ -715,7 +827,40 @@ class TensorPredictions:
         for a given feature.
         """
 
+        dic = self._get_feature_raw(drop_id=True)
+
+        # TODO: this wll not work with tensor, create appropriate function
+        # to convert from dict
+
         if self.idx is not None:
+            df = _sorted_dataframe(dic, self.idx, self._idx_order)
+
+            dic = {"id": self.idx, **dic}
+        else:
+            df = pd.DataFrame(dic)
+
+        if self.logger is not None:
+            self.logger.save_csv(df, filename=filename, logtime=logtime)
+
+        if mode == "dataframe":
+            return df
+        else:
+            return dic
+
+    @cached_property
+    def _idx_order(self):
+        # permutation sorting the samples by id
+        return np.argsort(np.asarray(self.idx), kind="stable")
+
+    def _get_feature_raw(self, drop_id=True):
+        """
+        Return the dict of arrays summarizing the feature results.
+
+        The id is not included if `drop_id` is true: this is useful when
+        merging the results of several features which share the same ids.
+        """
+
+        if self.idx is not None and drop_id is False:
             dic = {"id": self.idx}
         else:
             dic = {}
@@ -732,21 +877,32 @@ class TensorPredictions:
         if self.is_scalar is False:
             dic["norm_err"] = self.norm_errors
 
-        # TODO: this wll not work with tensor, create appropriate function
-        # to convert from dict
+        return dic
 
-        df = pd.DataFrame(dic)
+    def _evaluate(self, metric):
+        """
+        Evaluate a metric and cache the result.
 
-        if self.idx is not None:
-            df = df.set_index("id").sort_values(by=['id'])
+        Return the value of the metric and its standard deviation for an
+        ensemble (`None` otherwise).
+        """
 
-        if self.logger is not None:
-            self.logger.save_csv(df, filename=filename, logtime=logtime)
+        if metric not in self._metric_cache:
+            if self.all_y_pred is not None:
+                all_results = [self.method.evaluate(y, self.y_true,
+                                                    method=metric)
+                               for y in self.all_y_pred]
 
-        if mode == "dataframe":
-            return df
-        else:
-            return dic
+                result = np.mean(all_results)
+                std = np.std(all_results)
+            else:
+                result = self.method.evaluate(self.y_pred, self.y_true,
+                                              method=metric)
+                std = None
+
+            self._metric_cache[metric] = (result, std)
+
+        return self._metric_cache[metric]
 
     def feature_metric(self, metric=None, mode=None):
 
@@ -755,16 +911,7 @@ class TensorPredictions:
 
         metric = metric or self.metric or self.method.default_metric
 
-        if self.all_y_pred is not None:
-            all_results = [self.method.evaluate(y, self.y_true, method=metric)
-                           for y in self.all_y_pred]
-
-            result = np.mean(all_results)
-            std = np.std(all_results)
-        else:
-            result = self.method.evaluate(self.y_pred, self.y_true,
-                                          method=metric)
-            std = None
+        result, std = self._evaluate(metric)
 
         if mode == "text":
             text = "{} = {}".format(self.method._metric_names
@@ -785,15 +932,19 @@ class TensorPredictions:
 
         logger = self.logger or Logger
 
-        if self.all_y_pred is not None:
-            all_results = [self.method.eval_metrics(y, self.y_true,
-                                                    metrics=metrics)
-                           for y in self.all_y_pred]
+        if metrics is None:
+            if self.is_scalar is True:
+                metrics = self.method.metrics
+            else:
+                metrics = self.method.tensor_metrics
+
+        evaluations = {m: self._evaluate(m) for m in metrics}
 
-            results, std = datatools.average(all_results)
+        results = {m: v[0] for m, v in evaluations.items()}
+
+        if self.all_y_pred is not None:
+            std = {m: v[1] for m, v in evaluations.items()}
         else:
-            results = self.method.eval_metrics(self.y_pred, self.y_true,
-                                               metrics=metrics)
             std = None
 
         if self.logger is not None:
@@ -823,6 +974,49 @@ class TensorPredictions:
             else:
                 return results, std
 
+    # norms used for plotting tensors, cached since several plots are
+    # usually made for each feature
+
+    # TODO: change norm in argument?
+
+    @cached_property
+    def y_pred_norm(self):
+        return self.method.norm(self.y_pred, norm=2)
+
+    @cached_property
+    def y_true_norm(self):
+        return self.method.norm(self.y_true, norm=2)
+
+    @cached_property
+    def y_std_norm(self):
+        if self.y_std is None:
+            return None
+
+        return self.method.norm(self.y_std, norm=2)
+
+    def _feature_values(self, norm=True):
+        """
+        Return the predictions, targets and standard deviations to plot.
+
+        Tensors are replaced by their norms if `norm` is true, otherwise
+        they are flattened.
+        """
+
+        if norm is True and self.is_scalar is False:
+            pred = self.y_pred_norm
+            true = self.y_true_norm
+            std = self.y_std_norm
+        else:
+            pred = self.y_pred.ravel()
+            true = self.y_true.ravel()
+
+            if self.y_std is not None:
+                std = self.y_std.ravel()
+            else:
+                std = None
+
+        return pred, true, std
+
     def plot_feature(self, plottype="step", density=True, sigma=1, bins=None,
                      log=False, filename="", logtime=True, norm=True):
         """
@@ -837,23 +1031,7 @@ class TensorPredictions:
         logger = self.logger or Logger
         styles = logger.styles
 
-        if norm is True and self.is_scalar is False:
-            # TODO: change norm in argument?
-            pred = self.method.norm(self.y_pred, norm=2)
-            true = self.method.norm(self.y_true, norm=2)
-
-            if self.y_std is not None:
-                std = self.method.norm(self.y_std, norm=2)
-            else:
-                std = None
-        else:
-            pred = self.y_pred.reshape(-1)
-            true = self.y_true.reshape(-1)
-
-            if self.y_std is not None:
-                std = self.y_std.reshape(-1)
-            else:
-                std = None
+        pred, true, std = self._feature_values(norm)
 
         xlabel = str(self.feature)
 
@@ -866,7 +1044,9 @@ class TensorPredictions:
         else:
             fig, ax = plt.subplots()
 
-            bins = bins or logger.find_bins(pred)
+            if bins is None:
+                bins = logger.find_bins(pred)
+
             ylabel = "PDF" if density is True else "Count"
             label = [styles["label:pred"], styles["label:true"]]
             color = [styles["color:pred"], styles["color:true"]]
@@ -894,8 +1074,6 @@ class TensorPredictions:
 
         # errors defined without sign in [Skiena, p. 222]
 
-        # TODO: filter out infinite values for relative errors
-
         if norm is True and self.is_scalar is False:
             if relative is True:
                 errors = self.rel_norm_errors
@@ -909,14 +1087,14 @@ class TensorPredictions:
                     errors = self.rel_errors
                     xlabel = "%s (relative errors)" % self.feature
                 else:
-                    errors = np.abs(self.rel_errors)
+                    errors = self.abs_rel_errors
                     xlabel = "%s (unsigned relative errors)" % self.feature
             else:
                 if signed is True:
                     errors = self.errors
                     xlabel = "%s (absolute errors)" % self.feature
                 else:
-                    errors = np.abs(self.errors)
+                    errors = self.abs_errors
                     xlabel = "%s (unsigned absolute errors)" % self.feature
 
         if density is True:
@@ -926,17 +1104,17 @@ class TensorPredictions:
             ylabel = "Count"
             density = False
 
-        bins = bins or logger.find_bins(errors)
-
-        fig, ax = plt.subplots()
-
-        # hack to remove infinite values
+        # remove infinite and undefined values
         # this happens when considering relative errors in the case where
         # the original value is zero
-        # TODO: find better way
-        err = np.array([e for e in errors if e != np.inf])
+        errors = errors[np.isfinite(errors)]
 
-        ax.hist(err, linewidth=styles["linewidth:hist"], histtype='step', bins=bins,
+        if bins is None:
+            bins = logger.find_bins(errors)
+
+        fig, ax = plt.subplots()
+
+        ax.hist(errors, linewidth=styles["linewidth:hist"], histtype='step', bins=bins,
                 density=density, log=log,
                 color=styles["color:errors"])
 
@@ -959,8 +1137,20 @@ class TensorPredictions:
                             density=True, bins=None, log=False,
                             filename="", logtime=True, norm=True):
 
+        # compute the bin edges once for the plots building the histograms
+        # with numpy, instead of finding the range of the data for each plot
+        if bins is None:
+            logger = self.logger or Logger
+            pred, true, _ = self._feature_values(norm)
+
+            edges = np.histogram_bin_edges(pred, bins=logger.find_bins(pred),
+                                           range=(min(pred.min(), true.min()),
+                                                  max(pred.max(), true.max())))
+        else:
+            edges = bins
+
         feat1 = self.plot_feature(plottype="step", sigma=sigma,
-                                  density=density, bins=bins, log=log,
+                                  density=density, bins=edges, log=log,
                                   norm=norm)
 
         feat2 = self.plot_feature(plottype="seaborn", sigma=sigma,
@@ -968,7 +1158,7 @@ class TensorPredictions:
                                   norm=norm)
 
         feat3 = self.plot_feature(plottype="line", sigma=sigma,
-                                  density=density, bins=bins, log=log,
+                                  density=density, bins=edges, log=log,
                                   norm=norm)
 
         feat4 = self.plot_feature(plottype="plain", sigma=sigma,
@@ -184,7 +184,7 @@ def dict_to_dataframe(dic):
     features = [k for k, t in infer_types(dic, ncat=0).items()
                 if t in ("scalar", "integer", "binary", "string")]
 
-    df = pd.DataFrame({k: v for k, v in dic.items() if k in features})
+    df = pd.DataFrame({k: dic[k] for k in features})
 
     return df
 
@@ -64,20 +64,38 @@ class DataExploration:
             # remove features in `inputs` if they are already in `outputs`
             # this helps in the case where the inputs are infered from the
             # data
-            inputs = [f for f in inputs if f not in outputs]
+            excluded = set(outputs)
+            inputs = [f for f in inputs if f not in excluded]
 
         return inputs, outputs
 
-    def _prep_data(self, data, features):
+    def _prep_data(self, data, features=None):
 
         if not isinstance(data, (dict, pd.DataFrame)):
             raise TypeError("Data with type `{}` cannot be explored."
                             .format(type(data)))
 
         if isinstance(data, dict):
+            # convert only the requested columns
+            if features is not None:
+                data = {k: data[k] for k in features}
+
             data = dt.dict_to_dataframe(data)
 
-        data = data[features]
+        # selecting all the columns in order would only copy the dataframe
+        if features is not None and not (data.columns.is_unique and
+                                         data.columns.to_list() == features):
+            data = data[features]
+
+        # a dataframe built from a row-major array stores its columns with
+        # strides: copy them contiguously for the column-wise reductions
+        if data.shape[1] > 1 and data.dtypes.nunique() == 1:
+            first = data.iloc[:, 0].to_numpy()
+
+            if not first.flags.c_contiguous:
+                values = np.asfortranarray(data.to_numpy())
+                data = pd.DataFrame(values, index=data.index,
+                                    columns=data.columns, copy=False)
 
         return data
 
@@ -124,16 +142,36 @@ class DataExploration:
 
         bins = bins or min(50, Logger.find_bins(data))
 
-        axes = data.hist(bins=bins, figsize=figsize)
+        # only numerical columns can be plotted
+        data = data.select_dtypes(include="number")
+
+        n = data.shape[1]
+        ncols = int(np.ceil(np.sqrt(n)))
+        nrows = int(np.ceil(n / ncols))
+
+        fig, axes = plt.subplots(nrows, ncols, figsize=figsize, squeeze=False)
+
+        # compute each histogram with numpy and draw the bars directly,
+        # instead of going through pandas' plotting machinery
+        for ax, name in zip(axes.flat, data.columns):
+            x = data[name].to_numpy(dtype=np.float64, na_value=np.nan)
+            counts, edges = np.histogram(x[~np.isnan(x)], bins=bins)
 
-        fig = axes[0, 0].figure
+            ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge")
+            ax.set_title(name)
+            ax.grid(True)
+
+        for ax in axes.flat[n:]:
+            ax.set_visible(False)
+
+        fig.subplots_adjust(wspace=0.3, hspace=0.3)
 
         sns.despine(fig=fig)
 
         if self.logger is not None:
             self.logger.save_fig(fig, filename=filename, logtime=logtime)
 
-        plt.close()
+        plt.close(fig)
 
         return fig
 
@@ -160,8 +198,8 @@ class DataExploration:
         return fig
 
     def correlations(self, data, features=None, targets=None,
-                     method="pearson", cmap=None, y_rot=45,
-                     filename="", logtime=False):
+                     method="pearson", cmap=None, y_rot=45, ax=None,
+                     corr=None, dtype=np.float64, filename="", logtime=False):
         """
         Compute correlations between a set of features.
 
@@ -172,7 +210,8 @@ class DataExploration:
         data = self._prep_data(data, features + targets)
 
         corr, fig = describe.correlations(data, features, targets, method,
-                                          cmap, y_rot, logger=self.logger)
+                                          cmap, y_rot, ax=ax, corr=corr,
+                                          dtype=dtype, logger=self.logger)
         text = describe.correlation_text(corr)
 
         # TODO: save as json
@@ -181,13 +220,14 @@ class DataExploration:
             self.logger.save_fig(fig, filename + ".pdf'", logtime)
             # self.logger.save_text(text, filename + ".txt", logtime)
 
-        plt.close()
+        if ax is None:
+            plt.close(fig)
 
         return corr, fig, text
 
     def importances(self, data, outputs, inputs=None, n_estimators=20,
-                    sum_tensor=False, label_rot=45, ymax=1, filename="",
-                    logtime=False):
+                    sum_tensor=False, label_rot=45, ymax=1, n_jobs=-1,
+                    filename="", logtime=False):
         """
         Compute input importances for outputs from random forest.
 
@@ -198,16 +238,18 @@ class DataExploration:
                                                 sum_tensor=sum_tensor,
                                                 label_rot=label_rot,
                                                 ymax=ymax,
-                                                n_estimators=n_estimators)
+                                                n_estimators=n_estimators,
+                                                n_jobs=n_jobs)
 
         # TODO: could make heat map also
 
-        text = ""
+        lines = []
 
         for target, imp in importances.items():
-            text += "- {}\n  ".format(target)
-            text += describe.importance_text(imp).replace("\n-", "\n  -")
-            text += "\n"
+            imp_text = describe.importance_text(imp).replace("\n-", "\n  -")
+            lines.append("- {}\n  {}\n".format(target, imp_text))
+
+        text = "".join(lines)
 
         # TODO: save as json
 
@@ -223,8 +265,9 @@ class DataExploration:
 
         pass
 
-    def summary_io(self, data, outputs, inputs=None, dpi=150, filename="",
-                   logtime=False, display_text=False, display_fig=False):
+    def summary_io(self, data, outputs, inputs=None, method="pearson",
+                   dpi=150, filename="", logtime=False, display_text=False,
+                   display_fig=False):
 
         # TODO: add save_individual (to save each figures independently)
 
@@ -232,45 +275,71 @@ class DataExploration:
         # if inputs is None:
         #     inputs = [c for c in data.columns if c not in outputs]
 
-        fulltext = "# Dataset: analysis of inputs and outputs\n\n"
+        # convert the data once for all the analyses below
+        data = self._prep_data(data)
+
+        # collect the parts of the report and join them at the end
+        parts = ["# Dataset: analysis of inputs and outputs\n\n"]
         figs = []
 
         # scatter plots
         fig = self.scatter(data, outputs, inputs)
         figs.append(fig)
 
+        # compute the correlations once for all the variables used below,
+        # each matrix is then a slice of it (for Spearman, the data is thus
+        # ranked only once)
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if isinstance(outputs, str):
+            outputs = [outputs]
+
+        columns = ((inputs or self.inputs or data.columns.to_list())
+                   + outputs + self.outputs)
+        columns = list(dict.fromkeys(columns))
+        corr_all = describe.correlation_matrix(data[columns], method)
+
+        # the three correlation matrices are drawn side by side in a single
+        # figure, a matrix with only one variable is removed
+        corr_fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+        corr_texts = []
+
         # correlations between inputs and outputs
-        _, fig, text = self.correlations(data, inputs, outputs)
-        text = "## Correlations between inputs and outputs\n\n" + text
+        _, _, text = self.correlations(data, inputs, outputs, method,
+                                       ax=axes[0], corr=corr_all)
+        corr_texts.append("## Correlations between inputs and outputs\n\n"
+                          + text)
 
-        figs += [fig, Logger.text_to_fig(text)]
-        fulltext += text
-        fulltext += "\n\n"
+        # correlations between inputs and between outputs
+        for ax, features, name in ((axes[1], inputs, "inputs"),
+                                   (axes[2], outputs, "outputs")):
+            corr, _, text = self.correlations(data, features, None, method,
+                                              ax=ax, corr=corr_all)
 
-        # correlations between inputs
-        corr, fig, text = self.correlations(data, inputs)
-        if corr.shape != (1, 1):
-            text = "## Correlations between inputs\n\n" + text
+            if corr.shape != (1, 1):
+                corr_texts.append("## Correlations between {}\n\n"
+                                  .format(name) + text)
+            else:
+                ax.images[0].colorbar.remove()
+                ax.remove()
 
-            figs += [fig, Logger.text_to_fig(text)]
-            fulltext += text
-            fulltext += "\n\n"
+        corr_fig.tight_layout()
+        plt.close(corr_fig)
 
-        # correlations between outputs
-        corr, fig, text = self.correlations(data, outputs)
-        if corr.shape != (1, 1):
-            text = "## Correlations between outputs\n\n" + text
+        figs.append(corr_fig)
 
-            figs += [fig, Logger.text_to_fig(text)]
-            fulltext += text
-            fulltext += "\n\n"
+        for text in corr_texts:
+            figs.append(Logger.text_to_fig(text))
+            parts += [text, "\n\n"]
 
         # relative importances of inputs
         _, fig, text = self.importances(data, outputs, inputs)
         text = "## Feature importances (random forests)\n\n" + text
 
         figs += [fig, Logger.text_to_fig(text)]
-        fulltext += text
+        parts.append(text)
+
+        fulltext = "".join(parts)
 
         if display_text is True:
             print(fulltext)
@@ -288,25 +357,25 @@ class DataExploration:
 
         # TODO: add save_individual (to save each figures independently)
 
-        fulltext = "# Dataset: Exploratory Data Analysis\n\n"
+        # select the features once for all the analyses below
+        features, outputs = self._prep_features(features, data=data)
+        data = self._prep_data(data, features + outputs)
+
+        # collect the parts of the report and join them at the end
+        parts = ["# Dataset: Exploratory Data Analysis\n\n"]
         figs = []
 
         # general information
-        text = "## Informations\n\n"
-        text += self.info(data, features)
-        fulltext += "\n\n"
+        text = "## Informations\n\n" + self.info(data, features)
 
         figs.append(Logger.text_to_fig(text))
-        fulltext += text
-        fulltext += "\n\n\n"
+        parts += ["\n\n", text, "\n\n\n"]
 
         # statistics
-        text = "## Statistics (numerical)\n\n"
-        text += self.describe(data, features)
+        text = "## Statistics (numerical)\n\n" + self.describe(data, features)
 
         figs.append(Logger.text_to_fig(text))
-        fulltext += text
-        fulltext += "\n\n\n"
+        parts += [text, "\n\n\n"]
 
         # variable distribution
         fig = self.distributions(data, features, figsize=(10, 10))
@@ -317,10 +386,9 @@ class DataExploration:
         text = "## Correlations\n\n" + text
 
         figs += [fig, Logger.text_to_fig(text)]
-        fulltext += text
-        fulltext += "\n"
+        parts += [text, "\n", extra_text]
 
-        fulltext += extra_text
+        fulltext = "".join(parts)
 
         if extra_figs is not None:
             figs += extra_figs
@@ -23,6 +23,9 @@ The data structure can present the data according to several modes:
 """
 
 
+import functools
+import weakref
+
 import numpy as np
 import pandas as pd
 
@@ -52,11 +55,244 @@ _TYPES = ['scalar', 'vector', 'matrix', 'tensor']
 _TENSOR_ALIAS = {'tensor_0d': 'scalar', 'tensor_1d': 'vector',
                  'tensor_2d': 'matrix'}
 
+# types of tensors indexed by dimension (without the channels)
+_TENSOR_NAMES = ('scalar', 'vector', 'matrix')
+
+# scalers given by name
+_SCALERS = {'standard': preprocessing.StandardScaler,
+            'robust': preprocessing.RobustScaler,
+            'minmax': preprocessing.MinMaxScaler}
+
 
 # TODO: check how to ensure that all tensors have a shape
 # TODO: make the DataStructure behave like a list (for loop, in...)
 
 
+def _describe_element(value):
+    """
+    Describe an element of a feature by a hashable tuple.
+
+    Numbers are described by `("number",)`, sequences by `("tensor", shape)`
+    and other objects by `("other", type)`.
+    """
+
+    if isinstance(value, np.ndarray):
+        return "tensor", value.shape
+    elif isinstance(value, (list, tuple)):
+        return "tensor", np.shape(value)
+    elif (np.issubdtype(type(value), np.integer)
+            or np.issubdtype(type(value), np.floating)):
+        return ("number",)
+    else:
+        return "other", type(value)
+
+
+def _is_number_dtype(dtype):
+    """
+    Check if a column type holds numbers (integers or floats).
+    """
+
+    return (pd.api.types.is_numeric_dtype(dtype)
+            and not pd.api.types.is_bool_dtype(dtype)
+            and not pd.api.types.is_complex_dtype(dtype))
+
+
+def _tensor_type(shape):
+    """
+    Type of a tensor from its shape (including the channels).
+    """
+
+    ndim = len(shape) - 1
+
+    if 0 <= ndim < len(_TENSOR_NAMES):
+        return _TENSOR_NAMES[ndim]
+    else:
+        return 'tensor_{}d'.format(ndim)
+
+
+@functools.lru_cache(maxsize=64)
+def _infer_types_shapes(features, features_types, with_channels, firsts):
+    """
+    Compute the types and shapes of features.
+
+    `features_types` contains the items of the `features` argument of
+    `DataStructure` if it is a dict (None otherwise), and `firsts` describes
+    the first element of each feature in the data used for inference (see
+    `_describe_element`), or is None without inference. All arguments are
+    hashable such that the results are cached: structures are often built
+    several times with the same arguments (for example when creating models).
+
+    Types and shapes are returned as tuples of items.
+    """
+
+    def add_channel_dim(shape, feature):
+        shape = tuple(shape)
+        return shape if feature in with_channels else shape + (1,)
+
+    # map feature to types
+    types = {}
+    # map tensor feature to shape
+    shapes = {}
+
+    # TODO: refactor: for each representation, write special method
+
+    if features_types is not None:
+        for f, v in features_types:
+            # if the value is a shape, then the type must be a tensor
+            if isinstance(v, (tuple, list)):
+                # add trivial channel if necessary
+                shape = add_channel_dim(v, f)
+                types[f] = _tensor_type(shape)
+                shapes[f] = shape
+            elif isinstance(v, str):
+                types[f] = v
+                if v == 'scalar':
+                    shapes[f] = (1,)
+            elif v is None:
+                pass
+            else:
+                raise ValueError("`{}` type not usable.".format(type(v)))
+
+    # get missing type by looking to the dataset `infer` if defined
+    if firsts is not None:
+        for f, first in zip(features, firsts):
+            # first element of the data for the feature
+            if first[0] == "tensor":
+                # TODO: find maximal shape in series
+                shape = add_channel_dim(first[1], f)
+
+            # for dataframe only: infer[f].dtype
+            if f not in types:
+                if first[0] == "number":
+                    # types[f] = 'integer'
+                    types[f] = 'scalar'
+                    shapes[f] = (1,)
+                elif first[0] == "tensor":
+                    types[f] = _tensor_type(shape)
+                    shapes[f] = shape
+                else:
+                    raise TypeError("Type `{}` is not supported."
+                                    .format(first[1]))
+
+            # for tensor types defined by features but without the shape
+            if f not in shapes and first[0] == "tensor":
+                shapes[f] = shape
+
+    # replace tensor types for low dimensions (given by name)
+    for f, t in types.items():
+        if t in _TENSOR_ALIAS:
+            types[f] = _TENSOR_ALIAS[t]
+
+    # default type to scalar
+    missing_types = {f: "scalar" for f in features if f not in types}
+    types.update(missing_types)
+    shapes.update({f: (1,) for f in missing_types})
+
+    for f in features:
+        if f not in types:
+            raise ValueError("The feature `{}` has no type.".format(f))
+
+    for f, t in types.items():
+        if ((t in ('vector', 'matrix') or t.startswith('tensor'))
+                and f not in shapes):
+            raise ValueError("The feature `{f}` is a tensor without shape."
+                             .format(f))
+
+    return tuple(types.items()), tuple(shapes.items())
+
+
+def _affine_scaling(scaler, width):
+    """
+    Describe a fitted scaler as an affine map acting on each column.
+
+    Return a tuple `(kind, a, b)` where the kind gives the operation performed
+    by the scaler: `center` for `(x - a) / b`, `shift` for `(x - a) * b` and
+    `linear` for `x * b + a`. Return None for other scalers (including
+    unfitted ones or those fitted on a different number of columns), which
+    must be applied directly.
+    """
+
+    kind = type(scaler)
+
+    if kind is dt.ConstantScaler:
+        return "shift", scaler.min_, scaler.scale_
+
+    if getattr(scaler, "n_features_in_", None) != width:
+        return None
+
+    if kind is preprocessing.StandardScaler:
+        return ("center", scaler.mean_ if scaler.with_mean else 0.,
+                scaler.scale_ if scaler.with_std else 1.)
+    elif kind is preprocessing.RobustScaler:
+        return ("center", scaler.center_ if scaler.with_centering else 0.,
+                scaler.scale_ if scaler.with_scaling else 1.)
+    elif kind is preprocessing.MinMaxScaler and scaler.clip is False:
+        return "linear", scaler.min_, scaler.scale_
+    else:
+        return None
+
+
+def _apply_affine(array, params, inverse=False, block_size=2**16):
+    """
+    Apply in place affine maps on the columns of a 2d array.
+
+    The maps are given as a dict `{kind: (a, b)}` of parameter vectors (see
+    `_affine_scaling` for the kinds). If `inverse` is True, the inverse maps
+    are applied.
+
+    All the maps are applied on blocks of rows (of about `block_size`
+    elements) such that each block is read from memory only once.
+    """
+
+    params = [(kind, a.astype(array.dtype, copy=False),
+               b.astype(array.dtype, copy=False))
+              for kind, (a, b) in params.items()]
+
+    step = max(1, block_size // max(1, array.shape[1]))
+
+    for start in range(0, len(array), step):
+        x = array[start:start + step]
+
+        for kind, a, b in params:
+            if inverse is False:
+                if kind == "center":
+                    x -= a
+                    x /= b
+                elif kind == "shift":
+                    x -= a
+                    x *= b
+                else:
+                    x *= b
+                    x += a
+            else:
+                if kind == "center":
+                    x *= b
+                    x += a
+                elif kind == "shift":
+                    x /= b
+                    x += a
+                else:
+                    x -= a
+                    x /= b
+
+
+class _TransformCache(dict):
+    """
+    Dict of transformed data (a subclass can be weakly referenced).
+    """
+
+
+def _evict(cache_ref, key):
+    """
+    Remove an entry from a cache if the latter still exists.
+    """
+
+    cache = cache_ref()
+
+    if cache is not None:
+        cache.pop(key, None)
+
+
 class DataStructure:
     """
     Represent data with conversion
@@ -69,10 +305,15 @@ class DataStructure:
     original format. This is useful for predictions.
     """
 
+    # fixed set of attributes (faster access and smaller instances)
+    __slots__ = ('name', 'features', 'types', 'shapes', 'with_channels',
+                 'mode', 'scaler', 'dtype', 'pipeline', 'linear_shape',
+                 '_all_scalar', '_features_set', '_cache', '__weakref__')
+
     def __init__(self, features=None, datatypes=None, shapes=None,
                  with_channels=None, infer=None,
                  pipeline=None, scaler=None, filter_fn=None, mode='flat',
-                 name=''):
+                 dtype=None, cache=False, name=''):
         """
         List of features to be transformed. The types can be inferred from
         a dataframe or they can be forced.
@@ -119,6 +360,14 @@ class DataStructure:
         :type with_channels: tuple(str)
         :param infer: data with named features to infer the structure
         :type infer: dataframe, dict(str, array)
+        :param dtype: type of the transformed arrays (for example `np.float32`
+            to halve their size), if None keep the type of the data
+        :type dtype: type
+        :param cache: keep the transformations of dataframes until they are
+            deleted or the structure is fitted again (copies are returned;
+            modifications of a dataframe in place are not detected and give
+            the previous result)
+        :type cache: bool
         :param name: name of the data structure
         :type name: str
         """
@@ -151,6 +400,15 @@ class DataStructure:
         self._extract_features_types_shapes(features, datatypes, infer,
                                             infer_cols)
 
+        # number of columns in flat mode
+        self.linear_shape = dt.linear_shape(self.shapes.values(), cum=True)
+
+        # all features are numbers (one column each in flat mode)
+        self._all_scalar = all(s == (1,) for s in self.shapes.values())
+
+        # set of features for fast membership tests
+        self._features_set = frozenset(self.features)
+
         # default mode
         self.mode = mode
 
@@ -159,6 +417,11 @@ class DataStructure:
 
         self.scaler = self.set_scaler(scaler)
 
+        self.dtype = dtype
+
+        # transformed data indexed by dataframe id and transformation options
+        self._cache = _TransformCache() if cache is True else None
+
         # pass data through scikit pipeline before fit or transformation
         # implemented by the class
         # TODO: consider more general method/function
@@ -167,114 +430,87 @@ class DataStructure:
         if self.pipeline is not None:
             raise NotImplementedError
 
+    def __getstate__(self):
+        # cached results are indexed by ids, which are meaningless in a copy
+        state = {k: getattr(self, k) for k in self.__slots__
+                 if k != '__weakref__' and hasattr(self, k)}
+
+        if self._cache is not None:
+            state['_cache'] = _TransformCache()
+
+        return state
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
     def __contains__(self, key):
-        return key in self.features
+        return key in self._features_set
 
     def __iter__(self):
-        for f in self.features:
-            yield f
+        return iter(self.features)
 
     def _extract_features_types_shapes(self, features, datatypes, infer,
                                        infer_cols):
 
-        # TODO: make this function independent from class?
-
-        def add_channel_dim(shape, feature):
-            shape = tuple(shape)
-            return shape if feature in self.with_channels else shape + (1,)
-
         # list of feature names
-        self.features = []
-        # map feature to types
-        self.types = {}
-        # map tensor feature to shape
-        self.shapes = {}
+        names = []
 
         if features is None and datatypes is None:
             # take all columns from `infer` as features if none is given
-            self.features += list(infer_cols)
+            names += list(infer_cols)
         else:
             if isinstance(features, dict):
-                self.features += list(features.keys())
+                names += list(features.keys())
             elif isinstance(features, (list, tuple)):
-                self.features += list(features)
+                names += list(features)
 
             if isinstance(datatypes, dict):
-                self.features += list(features.keys())
+                names += list(features.keys())
 
-        # TODO: refactor: for each representation, write special method
+        # describe the first element of each feature in `infer`, such that
+        # the structure is computed by a cached function of hashable keys
+        if infer_cols is not None:
+            if isinstance(infer, pd.DataFrame):
+                # numerical columns are described from their type, and only
+                # the other columns are read
+                dtypes = infer.dtypes
+                first_key = tuple(("number",) if _is_number_dtype(dtypes[f])
+                                  else _describe_element(infer[f].iloc[0])
+                                  for f in names)
+            else:
+                first_key = tuple(_describe_element(infer[f][0])
+                                  for f in names)
+        else:
+            first_key = None
 
+        # the values are checked before calling the cached function, which
+        # requires hashable arguments
         if isinstance(features, dict):
+            features_key = []
+
             for f, v in features.items():
-                # if the value is a shape, then the type must be a tensor
                 if isinstance(v, (tuple, list)):
-                    # add trivial channel if necessary
-                    shape = add_channel_dim(v, f)
-                    self.types[f] = 'tensor_{}d'.format(len(shape) - 1)
-                    self.shapes[f] = shape
-                elif isinstance(v, str):
-                    self.types[f] = v
-                    if v == 'scalar':
-                        self.shapes[f] = (1,)
-                elif v is None:
-                    pass
-                else:
+                    v = tuple(v)
+                elif not (isinstance(v, str) or v is None):
                     raise ValueError("`{}` type not usable.".format(type(v)))
 
-        # get missing type by looking to the dataset `infer` if defined
-        if infer_cols is not None:
-            for f in self.features:
-                # first element of the data for the feature
-                if isinstance(infer, pd.DataFrame):
-                    first = infer[f].iloc[0]
-                else:
-                    first = infer[f][0]
-
-                if isinstance(first, (np.ndarray, list, tuple)):
-                    shape = np.shape(first)
-                    # TODO: find maximal shape in series
-
-                    shape = add_channel_dim(shape, f)
-
-                # for dataframe only: infer[f].dtype
-                if f not in self.types:
-                    if (np.issubdtype(type(first), np.integer)
-                            or np.issubdtype(type(first), np.floating)):
-                        # self.types[f] = 'integer'
-                        self.types[f] = 'scalar'
-                        self.shapes[f] = (1,)
-                    elif isinstance(first, (np.ndarray, list, tuple)):
-                        self.types[f] = 'tensor_{}d'.format(len(shape) - 1)
-                        self.shapes[f] = shape
-                    else:
-                        raise TypeError("Type `{}` is not supported."
-                                        .format(type(first)))
-
-                # for tensor types defined by features but without the shape
-                if (f not in self.shapes
-                        and isinstance(first, (np.ndarray, list, tuple))):
-                    self.shapes[f] = shape
-
-        # replace tensor types for low dimensions
-        for f, t in self.types.items():
-            if t in _TENSOR_ALIAS:
-                self.types[f] = _TENSOR_ALIAS[t]
-
-        # default type to scalar
-        missing_types = {f: "scalar" for f in self.features
-                         if f not in self.types}
-        self.types.update(missing_types)
-        self.shapes.update({f: (1,) for f in missing_types})
-
-        for f in self.features:
-            if f not in self.types:
-                raise ValueError("The feature `{}` has no type.".format(f))
-
-        for f, t in self.types.items():
-            if ((t in ('vector', 'matrix') or t.startswith('tensor'))
-                    and f not in self.shapes):
-                raise ValueError("The feature `{f}` is a tensor without shape."
-                                 .format(f))
+                features_key.append((f, v))
+
+            features_key = tuple(features_key)
+        else:
+            features_key = None
+
+        types, shapes = _infer_types_shapes(tuple(names), features_key,
+                                            tuple(self.with_channels),
+                                            first_key)
+
+        # list of feature names
+        self.features = names
+        # map feature to types
+        self.types = dict(types)
+        # map tensor feature to shape
+        self.shapes = dict(shapes)
 
     def __repr__(self):
         name = f" ({self.name})" if self.name else ""
@@ -287,10 +523,6 @@ class DataStructure:
     def __len__(self):
         return len(self.features)
 
-    @property
-    def linear_shape(self):
-        return dt.linear_shape(self.shapes.values(), cum=True)
-
     def set_scaler(self, scaler=None):
         """
         Set scalers for the data structure.
@@ -302,7 +534,17 @@ class DataStructure:
         if not isinstance(scaler, dict):
             # TODO: ignore binary data
             # temporary fix: search for onehot in feature name
-            scaler = {f: scaler for f in self.features if "onehot" not in f}
+            features = [f for f in self.features if "onehot" not in f]
+
+            # resolve a name once, then create a new scaler for each feature
+            if isinstance(scaler, str):
+                if scaler not in _SCALERS:
+                    raise ValueError(f"`{scaler}` not known.")
+
+                cls = _SCALERS[scaler]
+                return {f: cls() for f in features}
+
+            scaler = {f: scaler for f in features}
 
         scaler = {f: self._verify_scaler(s) for f, s in scaler.items()}
 
@@ -312,14 +554,10 @@ class DataStructure:
     def _verify_scaler(scaler):
 
         if isinstance(scaler, str):
-            if scaler == "standard":
-                scaler = preprocessing.StandardScaler()
-            elif scaler == "robust":
-                scaler = preprocessing.RobustScaler()
-            elif scaler == "minmax":
-                scaler = preprocessing.MinMaxScaler()
-            else:
+            if scaler not in _SCALERS:
                 raise ValueError(f"`{scaler}` not known.")
+
+            scaler = _SCALERS[scaler]()
         elif isinstance(scaler, (float, int)):
             scaler = dt.ConstantScaler(scaler)
 
@@ -339,23 +577,51 @@ class DataStructure:
         if "train" in X:
             X = X["train"]
 
+        self.clear_cache()
+
         if len(self.scaler) > 0:
-            for f, data in self.transform_col(X, scaling=False, flatten=True).items():
-                if f in self.scaler:
-                    self.scaler[f].fit(data)
+            # convert only the features which are scaled
+            X = self.data_filter(X)
+            arrays = dt.tab_to_array({f: X[f] for f in self.scaler if f in X})
+
+            for f, data in arrays.items():
+                if self.dtype is not None:
+                    data = data.astype(self.dtype, copy=False)
+
+                self.scaler[f].fit(data.reshape(data.shape[0], -1))
 
         return self
 
+    def clear_cache(self):
+        """
+        Remove all transformed data kept in the cache.
+        """
+
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _filter_dict(self, X):
+        return {k: v for k, v in X.items() if k in self._features_set}
+
+    def _filter_dataframe(self, X):
+        return X[self.features]
+
+    # filter used for each type of data
+    _filters = {dict: _filter_dict, pd.DataFrame: _filter_dataframe}
+
     def data_filter(self, X):
-        if isinstance(X, (dict, pd.DataFrame)):
-            if isinstance(X, dict):
-                X = {k: v for k, v in X.items() if k in self.features}
-            elif isinstance(X, pd.DataFrame):
-                X = X[self.features]
+        filter_fn = self._filters.get(type(X))
+
+        if filter_fn is None:
+            # subclasses of the supported types
+            for cls, fn in self._filters.items():
+                if isinstance(X, cls):
+                    filter_fn = fn
+                    break
+            else:
+                raise NotImplementedError
 
-            return X
-        else:
-            raise NotImplementedError
+        return filter_fn(self, X)
 
     def transform(self, X, mode=None, scaling=True, filtering=True, trivial_dim=False):
 
@@ -369,6 +635,27 @@ class DataStructure:
 
         mode = mode or self.mode
 
+        if self._cache is not None and isinstance(X, pd.DataFrame):
+            key = (id(X), X.shape, mode, scaling, trivial_dim)
+
+            if key not in self._cache:
+                self._cache[key] = self._transform(X, mode, scaling, trivial_dim)
+                # remove the result when the dataframe is deleted (its id can
+                # then be reused), without keeping the cache alive
+                weakref.finalize(X, _evict, weakref.ref(self._cache), key)
+
+            # callers can modify the result in place
+            result = self._cache[key]
+
+            if isinstance(result, dict):
+                return {k: v.copy() for k, v in result.items()}
+            else:
+                return result.copy()
+
+        return self._transform(X, mode, scaling, trivial_dim)
+
+    def _transform(self, X, mode, scaling, trivial_dim):
+
         if mode == 'flat':
             return self.transform_flat(X, scaling=scaling)
         elif mode == 'col':
@@ -380,12 +667,107 @@ class DataStructure:
 
     def transform_flat(self, X, scaling=False):
 
-        result = []
+        # a dataframe with only numerical columns is converted in one call
+        if self._all_scalar is True and isinstance(X, pd.DataFrame):
+            X = X[self.features]
 
-        for f, data in dt.tab_to_array(self.data_filter(X)).items():
-            result.append(self._transform_array(f, data, scaling=scaling, flatten=True))
+            # check the types as a list (indexing the series is slow)
+            if all(isinstance(d, np.dtype) and d.kind in "iuf"
+                   for d in X.dtypes.tolist()):
+                array = X.to_numpy(dtype=self.dtype, copy=True)
+
+                if scaling is True and len(self.scaler) > 0:
+                    blocks = [array[:, i:i + 1] for i in range(array.shape[1])]
+                    return self._scale_flat(self.features, blocks, array)
+                else:
+                    return array
+
+        arrays = dt.tab_to_array(self.data_filter(X))
+        blocks = [v.reshape(v.shape[0], -1) for v in arrays.values()]
+
+        if scaling is True and len(self.scaler) > 0:
+            return self._scale_flat(list(arrays.keys()), blocks)
+        elif self.dtype is not None:
+            # cast while merging
+            array = np.empty((len(blocks[0]), sum(b.shape[1] for b in blocks)),
+                             dtype=self.dtype)
+            return np.concatenate(blocks, axis=1, out=array)
+        else:
+            return np.hstack(blocks)
+
+    def _scale_flat(self, features, blocks, array=None):
+        """
+        Merge 2d arrays and scale their columns.
+
+        Instead of calling each scaler on its feature, the parameters of the
+        usual scalers are stacked into vectors covering all the columns, such
+        that each kind of affine map (see `_affine_scaling`) is applied once
+        on the whole array. Columns of other features are left unchanged by
+        these maps (they use the identity parameters). Other scalers are
+        called directly. The blocks are copied once, into an array allocated
+        with the final type.
+
+        If the blocks are already merged, the array containing them can be
+        given with `array` (the blocks are views of it): it is then scaled in
+        place if it has the final type.
+
+        The parameters are collected at each call such that the scalers can be
+        fitted independently of the structure.
+        """
+
+        blocks = list(blocks)
+        widths = [b.shape[1] for b in blocks]
+        total = sum(widths)
+
+        # vectors (a, b) for each kind of map, initialized to the identity
+        params = {}
+        dtypes = []
+        direct = False
+
+        start = 0
+
+        for i, (f, block, width) in enumerate(zip(features, blocks, widths)):
+            stop = start + width
+            scaler = self.scaler.get(f)
+
+            if scaler is None:
+                dtypes.append(block.dtype)
+            else:
+                affine = _affine_scaling(scaler, width)
 
-        return np.hstack(result)
+                if affine is None:
+                    blocks[i] = scaler.transform(block)
+                    dtypes.append(blocks[i].dtype)
+                    direct = True
+                else:
+                    kind, a, b = affine
+                    if kind not in params:
+                        params[kind] = (np.zeros(total), np.ones(total))
+                    params[kind][0][start:stop] = a
+                    params[kind][1][start:stop] = b
+
+                    # scikit scalers keep floating types
+                    if block.dtype.kind == "f":
+                        dtypes.append(block.dtype)
+                    else:
+                        dtypes.append(np.dtype(np.float64))
+
+            start = stop
+
+        if self.dtype is not None:
+            # the scaling is computed directly in the requested precision
+            dtype = np.dtype(self.dtype)
+        else:
+            dtype = np.result_type(*dtypes)
+
+        # directly scaled blocks are not views of the array anymore
+        if array is None or array.dtype != dtype or direct is True:
+            array = np.empty((len(blocks[0]), total), dtype=dtype)
+            np.concatenate(blocks, axis=1, out=array)
+
+        _apply_affine(array, params)
+
+        return array
 
     def _transform_array(self, feature, array, scaling=False, flatten=False):
         """
@@ -395,14 +777,22 @@ class DataStructure:
         shape.
 
         Moreover, the method checks whether there is a scaler for the corresponding feature. If
-        not, it just returns the array.
+        not, it just returns the array. The array is finally cast to `dtype` if it is defined.
         """
 
+        scaler = self.scaler.get(feature) if scaling is True else None
+
+        # nothing to do
+        if scaler is None and self.dtype is None and flatten is False:
+            return array
+
         shape = array.shape
 
-        if scaling is True and len(self.scaler) > 0:
-            if feature in self.scaler:
-                array = self.scaler[feature].transform(array.reshape(shape[0], -1))
+        if scaler is not None:
+            array = scaler.transform(array.reshape(shape[0], -1))
+
+        if self.dtype is not None:
+            array = array.astype(self.dtype, copy=False)
 
         if flatten is True:
             return array.reshape(shape[0], -1)
@@ -422,13 +812,16 @@ class DataStructure:
         if isinstance(X, pd.DataFrame):
             # this condition must appear first because next condition also matches the id column
             # in a dataframe but does not convert the index
-            result["id"] = X.index.to_numpy()
+            index = X.index
+
+            if isinstance(index, pd.RangeIndex):
+                # pandas would keep the materialized range in the index
+                result["id"] = np.arange(index.start, index.stop, index.step)
+            else:
+                result["id"] = index.to_numpy(copy=False)
         elif "id" in X:
             result["id"] = X["id"]
 
-        for f, data in dt.tab_to_array(self.data_filter(X)).items():
-            result[f] = self._transform_array(f, data, scaling=scaling, flatten=flatten)
-
         # TODO: improve this: I think that padding should not be done here
         #       but precise it in the explanations of the class
 
@@ -437,16 +830,19 @@ class DataStructure:
         # does not know about shape. Since padding must be done before,
         # the only point can be the additional `1` of the last dimension.
 
-        # if `trivial_dim` is True, include the final `1`
-        if flatten is False:
-            if trivial_dim is True:
-                for k, v in result.items():
-                    if k != 'id' and v.shape[1:] != self.shapes[k]:
-                        result[k] = v.reshape(-1, *self.shapes[k])
-            else:
-                for k, v in result.items():
-                    if k != 'id' and v.shape[-1] == 1:
-                        result[k] = v.reshape(*v.shape[:-1])
+        # if `trivial_dim` is True, include the final `1` (the shape is fixed
+        # right after the transformation, without a second loop on results)
+        for f, data in dt.tab_to_array(self.data_filter(X)).items():
+            v = self._transform_array(f, data, scaling=scaling, flatten=flatten)
+
+            if flatten is False and f != 'id':
+                if trivial_dim is True:
+                    if v.shape[1:] != self.shapes[f]:
+                        v = v.reshape(-1, *self.shapes[f])
+                elif v.shape[-1] == 1:
+                    v = v.reshape(*v.shape[:-1])
+
+            result[f] = v
 
         return result
 
@@ -463,19 +859,89 @@ class DataStructure:
 
     def inverse_transform_col(self, y, scaling=False):
         dic = {}
+        shapes = {}
 
         for k, v in y.items():
             shape = v.shape if k in self.with_channels else v.shape[:-1]
             if shape == ():
                 shape = (-1,)
 
-            if scaling is True and len(self.scaler) > 0:
-                if k in self.scaler:
-                    v = self.scaler[k].inverse_transform(v.reshape(shape[0], -1))
+            shapes[k] = shape
+            dic[k] = v
+
+        if scaling is True and len(self.scaler) > 0:
+            dic = self._inverse_scale_col(dic)
+
+        return {k: v.reshape(*shapes[k]) for k, v in dic.items()}
+
+    def _inverse_scale_col(self, y):
+        """
+        Undo the scaling of each array of a dict.
+
+        This is the inverse of `_scale_flat`: the arrays of the features with
+        a usual scaler are merged into a single 2d array, on which the inverse
+        of each kind of affine map is applied once, before being split back
+        (the arrays of the result are views of the merged array). Other scalers
+        are called directly.
+        """
+
+        dic = {}
+
+        features = []
+        blocks = []
+        affines = []
+
+        for k, v in y.items():
+            scaler = self.scaler.get(k)
+
+            if scaler is None:
+                dic[k] = v
+                continue
+
+            block = v.reshape(len(v), -1)
+            affine = _affine_scaling(scaler, block.shape[1])
+
+            if affine is None:
+                dic[k] = scaler.inverse_transform(block)
+            else:
+                features.append(k)
+                blocks.append(block)
+                affines.append(affine)
+
+        if len(blocks) == 0:
+            return {k: dic[k] for k in y}
+
+        widths = [b.shape[1] for b in blocks]
+        total = sum(widths)
+
+        # scikit scalers keep floating types
+        dtypes = [b.dtype if b.dtype.kind == "f"
+                  else np.dtype(np.float64) for b in blocks]
+
+        array = np.empty((len(blocks[0]), total), dtype=np.result_type(*dtypes))
+        np.concatenate(blocks, axis=1, out=array)
+
+        # vectors (a, b) for each kind of map, initialized to the identity
+        params = {}
+        start = 0
+
+        for width, (kind, a, b) in zip(widths, affines):
+            if kind not in params:
+                params[kind] = (np.zeros(total), np.ones(total))
+            params[kind][0][start:start + width] = a
+            params[kind][1][start:start + width] = b
+
+            start += width
+
+        _apply_affine(array, params, inverse=True)
+
+        start = 0
 
-            dic[k] = v.reshape(*shape)
+        for f, width, dtype in zip(features, widths, dtypes):
+            dic[f] = array[:, start:start + width].astype(dtype, copy=False)
+            start += width
 
-        return dic
+        return {k: dic[k] for k in y}
 
     def average(self, ensemble):
         """
@@ -853,7 +853,7 @@ class Model:
         if self.inputs is not None:
             name = self.inputs.name or "Inputs"
 
-            if save_io is True:
+            if save_io is True and filename != "":
                 params["inputs"] = self.inputs.summary(name=name)
 
             text += "\n\n"
@@ -862,7 +862,7 @@ class Model:
         if self.outputs is not None:
             name = self.outputs.name or "Outputs"
 
-            if save_io is True:
+            if save_io is True and filename != "":
                 params["outputs"] = self.outputs.summary(name=name)
 
             text += "\n\n"
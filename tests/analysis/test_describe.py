@@ -0,0 +1,58 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from mltools.analysis.describe import correlation_matrix
+
+
+rng = np.random.default_rng(0)
+df = pd.DataFrame({'a': rng.normal(size=20), 'b': rng.normal(size=20),
+                   'c': rng.integers(0, 5, 20)})
+df['d'] = df['a'] + 0.5 * df['b']
+
+
+def test_correlation_matrix_pearson():
+
+    assert np.allclose(correlation_matrix(df), df.corr())
+
+
+def test_correlation_matrix_spearman():
+
+    assert np.allclose(correlation_matrix(df, method='spearman'),
+                       df.corr(method='spearman'))
+
+
+def test_correlation_matrix_kendall():
+
+    assert np.allclose(correlation_matrix(df, method='kendall'),
+                       df.corr(method='kendall'))
+
+
+def test_correlation_matrix_unknown_method():
+
+    with pytest.raises(ValueError):
+        correlation_matrix(df, method='pearsonn')
+
+
+def test_correlation_matrix_missing():
+
+    data = pd.DataFrame(rng.normal(size=(12, 4)), columns=list('abcd'))
+    data.loc[[1, 4], 'a'] = np.nan
+    data.loc[2, 'b'] = np.inf
+    data.loc[7, 'c'] = -np.inf
+
+    # constant column
+    data['k'] = 3.
+
+    # pairs with less than 2 common rows: (e, a) and (e, f)
+    data['e'] = np.nan
+    data.loc[[0, 1], 'e'] = [1., 2.]
+    data['f'] = np.nan
+    data.loc[[5, 6, 7], 'f'] = [1., 3., 2.]
+
+    corr = correlation_matrix(data)
+
+    assert np.allclose(corr, data.corr(), equal_nan=True)
+    assert np.isnan(corr.loc['e', 'a']) and np.isnan(corr.loc['e', 'f'])
+    assert corr['k'].isna().all()
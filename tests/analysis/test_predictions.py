@@ -0,0 +1,88 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from mltools.analysis.predictions import Predictions
+
+
+X = {'id': np.arange(6), 'a': np.linspace(0., 1., 6)}
+y_true = {'s': np.array([1., 2., -3., 4., 5., -6.]),
+          'u': np.array([0.5, -1., 1.5, 2., -2.5, 3.])}
+y_pred = {'s': np.array([1.5, 1.8, -2.5, 4.2, 4., -6.6]),
+          'u': np.array([0.4, -1.2, 1.5, 2.5, -2., 2.7])}
+
+
+def test_predictions_dataframe_copy():
+
+    p = Predictions({k: v.copy() for k, v in X.items()},
+                    y_pred={k: v.copy() for k, v in y_pred.items()},
+                    y_true={k: v.copy() for k, v in y_true.items()})
+    errors = p.get_errors(mode='dict')['s'].copy()
+
+    frames = [p.get_X(mode='dataframe'), p.get_y_pred(mode='dataframe'),
+              p.get_y_true(mode='dataframe'), p.get_errors(mode='dataframe')]
+    for df, f in zip(frames, ['a', 's', 's', 's']):
+        df.loc[0, f] = 1000
+
+    assert p.X['a'][0] == 0.
+    assert p.y_pred['s'][0] == 1.5
+    assert p.y_true['s'][0] == 1.
+    assert np.array_equal(p.get_errors(mode='dict')['s'], errors)
+
+
+def test_predictions_dataframe_copy_mixed_types():
+
+    p = Predictions(X, y_pred={'s': y_pred['s'], 'i': np.arange(1, 7)},
+                    y_true={'s': y_true['s'], 'i': np.arange(2, 8)})
+    errors = p.predictions['i'].errors.copy()
+    rel_errors = p.predictions['i'].rel_errors.copy()
+
+    df = p.get_errors(mode='dataframe')
+    df.loc[0, 'i'] = 1000
+
+    assert np.array_equal(p.predictions['i'].errors, errors)
+    assert np.array_equal(p.predictions['i'].rel_errors, rel_errors)
+
+
+def test_predictions_errors():
+
+    p = Predictions(X, y_pred=y_pred, y_true=y_true)
+
+    errors = p.get_errors(mode='dict')
+    rel_errors = p.get_errors(mode='dict', relative=True)
+
+    for f in ['s', 'u']:
+        assert np.allclose(errors[f], y_true[f] - y_pred[f])
+        assert np.allclose(rel_errors[f],
+                           (y_true[f] - y_pred[f]) / np.abs(y_pred[f]))
+
+    assert np.allclose(p.get_errors(mode='dataframe'), pd.DataFrame(errors))
+
+
+def test_predictions_describe_errors():
+
+    p = Predictions(X, y_pred=y_pred, y_true=y_true)
+
+    percentiles = [0.25, 0.5, 0.75, 0.95]
+
+    for relative in [False, True]:
+        errors = pd.DataFrame(p.get_errors(mode='dict', relative=relative))
+        expected = errors.abs().describe(percentiles=percentiles)
+
+        assert np.allclose(p.describe_errors(relative=relative), expected)
+
+    describe = p.describe_errors()
+
+    assert np.allclose(describe['s'], [6., 0.5, 0.296648, 0.2, 0.275, 0.5,
+                                       0.575, 0.9, 1.])
+
+
+def test_predictions_all_feature_all_metrics():
+
+    p = Predictions(X, y_pred=y_pred, y_true=y_true)
+
+    text = ("- s\n\t- RMSE = 0.569\n\t- MAE  = 0.500\n"
+            "- u\n\t- RMSE = 0.327\n\t- MAE  = 0.267")
+
+    assert p.all_feature_all_metrics(mode='text') == text
@@ -7,7 +7,7 @@ from mltools.data.datatools import (tensor_name, tensor_dim, data_shapes,
                                     embedding_shape, is_homogeneous, pad_array,
                                     pad_data, seq_to_array, tab_to_array,
                                     linear_shape, linear_indices, split_array,
-                                    array_to_dict)
+                                    array_to_dict, dict_to_dataframe)
 
 
 s = 8
@@ -456,3 +456,15 @@ def test_array_to_dict():
                               true.keys(), true.values()):
         assert (v1 == v2).all()
         assert k1 == k2
+
+
+def test_dict_to_dataframe_copy():
+
+    dic = {'a': np.array([3, 4]), 'b': np.array([0., 1.])}
+
+    df = dict_to_dataframe(dic)
+    df.loc[0, 'a'] = 7
+    df.loc[0, 'b'] = 7.
+
+    assert dic['a'][0] == 3
+    assert dic['b'][0] == 0.
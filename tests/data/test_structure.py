@@ -1,3 +1,8 @@
+import copy
+import gc
+import pickle
+import weakref
+
 import pytest
 
 import numpy as np
@@ -91,3 +96,99 @@ def test_structure_init_feature_channels():
                         'square': 'vector'}
     assert ds.shapes == {'id': (1,), 'number': (1,), 'line': (3,),
                          'square': (2, 2)}
+
+
+def test_structure_transform_flat_scaler():
+
+    ds = DataStructure(['id', 'number', 'line'], infer=df,
+                       scaler={'number': 'standard', 'line': 'minmax'})
+    ds.fit(df)
+
+    line = dic['line']
+    expected = np.c_[dic['id'],
+                     (dic['number'] - dic['number'].mean())
+                     / dic['number'].std(),
+                     (line - line.min(axis=0)) / np.ptp(line, axis=0)]
+
+    assert np.allclose(ds(df), expected)
+
+
+def test_structure_inverse_transform_scaler():
+
+    ds = DataStructure(['number', 'line'], infer=df,
+                       scaler={'number': 'robust', 'line': 'minmax'})
+    ds.fit(df)
+
+    y = ds(df, mode='col', trivial_dim=True)
+    X = ds.inverse_transform(y)
+
+    assert np.allclose(X['number'], dic['number'])
+    assert np.allclose(X['line'], dic['line'])
+
+
+def test_structure_transform_cache():
+
+    ds = DataStructure(['id', 'number'], infer=df, scaler='standard',
+                       cache=True)
+    ds.fit(df)
+
+    X = ds(df)
+    key = next(iter(ds._cache))
+
+    assert np.array_equal(ds(df), X)
+    assert ds._cache[key] is not X
+
+    # the returned arrays are copies of the cached ones
+    X[0] = 1000
+    assert not np.array_equal(ds(df), X)
+
+    ds(df, mode='col')
+    assert len(ds._cache) == 2
+
+    ds.fit(df)
+    assert len(ds._cache) == 0
+
+
+def test_structure_init_feature_infer_missing():
+
+    data = pd.DataFrame({'a': pd.array([None, 1, 2], dtype='Int64'),
+                         'b': [np.nan, 1., 2.]})
+
+    ds = DataStructure(infer=data)
+
+    assert ds.types == {'a': 'scalar', 'b': 'scalar'}
+    assert ds.shapes == {'a': (1,), 'b': (1,)}
+
+
+def test_structure_init_feature_dict_error():
+
+    with pytest.raises(ValueError):
+        DataStructure({'id': 'scalar', 'line': np.array([3])})
+
+    with pytest.raises(ValueError):
+        DataStructure({'id': 'scalar', 'line': {'shape': (3,)}})
+
+
+def test_structure_transform_cache_copy():
+
+    data = df[['id', 'number']].copy()
+
+    ds = DataStructure(['id', 'number'], infer=data, cache=True)
+    ds(data)
+
+    copied = copy.deepcopy(ds)
+    pickled = pickle.loads(pickle.dumps(ds))
+
+    assert len(ds._cache) == 1
+    assert len(copied._cache) == 0 and len(pickled._cache) == 0
+    assert np.array_equal(copied(data), ds(data))
+
+    # the cache is not kept alive by the dataframes
+    cache = weakref.ref(ds._cache)
+    del ds
+    gc.collect()
+
+    assert cache() is None
+
+    del data
+    gc.collect()